@@ -0,0 +1,235 @@
+"""Micro/macro benchmarks for the rag-observatory hot paths.
+
+Usage:
+    python benchmarks/bench.py run --runs 5000 --out workspace/bench/base.json
+    python benchmarks/bench.py compare workspace/bench/base.json workspace/bench/new.json
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from rag_observatory import __version__
+from rag_observatory.exporters import BatchProcessor, InMemoryExporter
+from rag_observatory.report import _read_traces, generate_report_html
+from rag_observatory.schema import Span, Trace, validate_trace_dict
+from rag_observatory.tracing import Tracer, write_trace_jsonl
+
+from synthetic import SynthConfig, generate_traces, write_trace_dir
+
+
+# A stage is (setup, fn, ops): setup() builds fresh state outside the timed region,
+# fn(state) is the measured work, ops is the number of logical operations per call.
+Stage = Tuple[Callable[[], Any], Callable[[Any], Any], int]
+
+
+def _to_trace(d: Dict[str, Any]) -> Trace:
+    return Trace(
+        schema_version=d["schema_version"],
+        run_id=d["run_id"],
+        ts=d["ts"],
+        input=d["input"],
+        spans=[Span(s["name"], s["start_ms"], s["end_ms"], s["attrs"]) for s in d["spans"]],
+        output=d["output"],
+        metrics=d["metrics"],
+    )
+
+
+def build_stages(cfg: SynthConfig, work_dir: Path) -> Dict[str, Stage]:
+    dicts = list(generate_traces(cfg))
+    traces = [_to_trace(d) for d in dicts]
+    corpus_dir = work_dir / "corpus"
+    write_trace_dir(cfg, str(corpus_dir))
+    preview = ["x" * cfg.attr_chars] * cfg.retrieved_k
+
+    def tracer_span(_: Any) -> None:
+        for i in range(cfg.runs):
+            tr = Tracer(query="q")
+            for j in range(cfg.spans_per_run):
+                with tr.span("retrieve" if j == 0 else "generate", top_k=cfg.retrieved_k) as sp:
+                    sp.set("retrieved_preview", preview)
+            tr.finalize()
+
+    def write_setup() -> Path:
+        out = work_dir / "write"
+        shutil.rmtree(out, ignore_errors=True)
+        return out
+
+    def write_jsonl(out: Path) -> None:
+        for t in traces:
+            write_trace_jsonl(t, str(out))
+
+    def batch_setup() -> BatchProcessor:
+        return BatchProcessor(InMemoryExporter(), max_queue_size=len(traces) + 1)
+
+    def batch_export(proc: BatchProcessor) -> None:
+        for t in traces:
+            proc.on_end(t)
+        proc.shutdown()
+
+    def validate(_: Any) -> None:
+        for d in dicts:
+            validate_trace_dict(d)
+
+    def report_setup() -> Path:
+        return work_dir / "report.html"
+
+    return {
+        "tracer_span": (lambda: None, tracer_span, cfg.runs * cfg.spans_per_run),
+        "write_trace_jsonl": (write_setup, write_jsonl, cfg.runs),
+        "batch_export": (batch_setup, batch_export, cfg.runs),
+        "read_traces": (lambda: None, lambda _: _read_traces(str(corpus_dir)), cfg.runs),
+        "validate_trace_dict": (lambda: None, validate, cfg.runs),
+        "generate_report_html": (
+            report_setup,
+            lambda out: generate_report_html(str(corpus_dir), str(out)),
+            cfg.runs,
+        ),
+    }
+
+
+def measure(stage: Stage, repeat: int) -> Dict[str, Any]:
+    setup, fn, ops = stage
+    times: List[float] = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(state)
+        times.append(time.perf_counter() - t0)
+
+    # Separate pass: tracemalloc slows allocation-heavy code, so keep it out of timings.
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    med = statistics.median(times)
+    return {
+        "ops": ops,
+        "times_s": times,
+        "min_s": min(times),
+        "median_s": med,
+        "ops_per_s": ops / med if med > 0 else float("inf"),
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    cfg = SynthConfig(
+        runs=args.runs,
+        spans_per_run=args.spans,
+        attr_chars=args.attr_chars,
+        label_ratio=args.label_ratio,
+        seed=args.seed,
+    )
+    work_dir = Path(tempfile.mkdtemp(prefix="ragobs-bench-"))
+    try:
+        stages = build_stages(cfg, work_dir)
+        selected = args.only or list(stages)
+        results: Dict[str, Any] = {}
+        for name in selected:
+            if name not in stages:
+                print(f"unknown stage: {name} (have: {', '.join(stages)})", file=sys.stderr)
+                return 2
+            res = measure(stages[name], args.repeat)
+            results[name] = res
+            print(
+                f"{name:<22} median {res['median_s'] * 1000:10.2f} ms  "
+                f"{res['ops_per_s']:12.0f} ops/s  peak {res['peak_kib']:10.1f} KiB"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    doc = {
+        "meta": {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "config": asdict(cfg),
+        },
+        "stages": results,
+    }
+    if args.out:
+        outp = Path(args.out)
+        outp.parent.mkdir(parents=True, exist_ok=True)
+        outp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"results written: {outp}")
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    if base["meta"].get("config") != new["meta"].get("config"):
+        print("warning: synthetic configs differ; numbers are not directly comparable")
+
+    regressions = 0
+    print(f"{'stage':<22} {'base ms':>10} {'new ms':>10} {'delta':>8} {'peak KiB base/new':>22}")
+    for name, b in base["stages"].items():
+        n = new["stages"].get(name)
+        if n is None:
+            print(f"{name:<22} {'(missing in new)':>30}")
+            continue
+        delta = (n["median_s"] - b["median_s"]) / b["median_s"] * 100.0 if b["median_s"] else 0.0
+        flag = ""
+        if delta > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{name:<22} {b['median_s'] * 1000:10.2f} {n['median_s'] * 1000:10.2f} {delta:+7.1f}% "
+            f"{b['peak_kib']:10.1f}/{n['peak_kib']:<10.1f}{flag}"
+        )
+    for name in new["stages"]:
+        if name not in base["stages"]:
+            print(f"{name:<22} {'(new stage)':>30}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="bench", description="rag-observatory benchmarks")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Run benchmarks on a synthetic corpus")
+    r.add_argument("--runs", type=int, default=2000, help="synthetic runs (traces)")
+    r.add_argument("--spans", type=int, default=3, help="spans per run")
+    r.add_argument("--attr-chars", type=int, default=80, help="size of string attrs")
+    r.add_argument("--label-ratio", type=float, default=0.5, help="fraction of runs with gold labels")
+    r.add_argument("--seed", type=int, default=1234)
+    r.add_argument("--repeat", type=int, default=5, help="timed repetitions per stage")
+    r.add_argument("--only", nargs="*", help="restrict to these stage names")
+    r.add_argument("--out", help="write JSON results here")
+    r.set_defaults(func=cmd_run)
+
+    c = sub.add_parser("compare", help="Diff two result files")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=10.0, help="regression threshold (%% slower)")
+    c.add_argument("--fail-on-regression", action="store_true")
+    c.set_defaults(func=cmd_compare)
+    return p
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
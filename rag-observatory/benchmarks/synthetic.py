@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import random
+import string
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from rag_observatory.schema import SCHEMA_VERSION
+
+
+_SPAN_NAMES = ["retrieve", "rerank", "generate"]
+
+
+@dataclass
+class SynthConfig:
+    """Shape of a synthetic trace corpus."""
+
+    runs: int = 1000
+    spans_per_run: int = 3
+    attr_chars: int = 80
+    retrieved_k: int = 5
+    corpus_docs: int = 200
+    label_ratio: float = 0.5
+    slow_ratio: float = 0.05
+    seed: int = 1234
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(n))
+
+
+def make_trace(rng: random.Random, cfg: SynthConfig, i: int, t0: datetime) -> Dict[str, Any]:
+    doc_ids = [f"doc_{rng.randrange(cfg.corpus_docs):05d}" for _ in range(cfg.retrieved_k)]
+    meta: Dict[str, Any] = {}
+    if rng.random() < cfg.label_ratio:
+        gold = doc_ids[0] if rng.random() < 0.7 else f"doc_{rng.randrange(cfg.corpus_docs):05d}"
+        meta["gold_doc_ids"] = [gold]
+        meta["expected_answer_contains"] = ["context"]
+
+    spans: List[Dict[str, Any]] = []
+    cursor = 0
+    for j in range(cfg.spans_per_run):
+        name = _SPAN_NAMES[j] if j < len(_SPAN_NAMES) else f"custom_{j}"
+        dur = int(rng.lognormvariate(3.5, 0.6))
+        attrs: Dict[str, Any] = {"note": _text(rng, cfg.attr_chars)}
+        if name == "retrieve":
+            attrs["top_k"] = cfg.retrieved_k
+            attrs["retrieved_ids"] = doc_ids
+            attrs["retrieved_preview"] = [_text(rng, cfg.attr_chars) for _ in doc_ids]
+        elif name == "generate":
+            if rng.random() < cfg.slow_ratio:
+                dur += 2000
+            attrs["answer_chars"] = cfg.attr_chars
+        spans.append({"name": name, "start_ms": cursor, "end_ms": cursor + dur, "attrs": attrs})
+        cursor += dur
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "run_id": uuid.UUID(int=rng.getrandbits(128)).hex,
+        "ts": (t0 + timedelta(milliseconds=i * 250)).isoformat(),
+        "input": {"query": f"synthetic query {i % 997}: {_text(rng, 40)}", "meta": meta},
+        "spans": spans,
+        "output": {"answer": f"Based on the retrieved context, {_text(rng, cfg.attr_chars)}", "citations": doc_ids[:2]},
+        "metrics": {"latency_total_ms": cursor},
+    }
+
+
+def generate_traces(cfg: SynthConfig) -> Iterator[Dict[str, Any]]:
+    """Yield `cfg.runs` deterministic trace dicts (same seed -> same corpus)."""
+    rng = random.Random(cfg.seed)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(cfg.runs):
+        yield make_trace(rng, cfg, i, t0)
+
+
+def write_trace_dir(cfg: SynthConfig, trace_dir: str, runs_per_file: int = 100_000) -> List[Path]:
+    """Write a synthetic corpus as JSONL files, split like daily rotated traces."""
+    out_dir = Path(trace_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    f = None
+    try:
+        for i, t in enumerate(generate_traces(cfg)):
+            if i % runs_per_file == 0:
+                if f is not None:
+                    f.close()
+                path = out_dir / f"traces-synth-{i // runs_per_file:04d}.jsonl"
+                paths.append(path)
+                f = path.open("w", encoding="utf-8")
+            f.write(json.dumps(t, ensure_ascii=False) + "\n")
+    finally:
+        if f is not None:
+            f.close()
+    return paths
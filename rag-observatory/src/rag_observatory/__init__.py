@@ -1,2 +1,2 @@
-__all__ = ['tracing', 'metrics', 'report']
+__all__ = ['tracing', 'metrics', 'report', 'costs', 'exporters', 'cache']
 __version__ = '0.1.0'
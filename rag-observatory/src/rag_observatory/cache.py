@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class RetrievalCache:
+    """LRU + TTL cache of retrieval results (doc id lists) keyed by normalized query.
+
+    Timestamps are wall-clock so entries can be persisted to `path` and reloaded.
+    Safe to share between request threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: Optional[float] = 600.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.path = path
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_s is not None and now - stored_at > self.ttl_s
+
+    def get(self, key: str, valid: Optional[Callable[[List[str]], bool]] = None) -> Optional[List[str]]:
+        """Cached ids for `key`, or None. Entries rejected by `valid` are evicted and count as misses."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and (
+                self._expired(item[0], self._clock()) or (valid is not None and not valid(item[1]))
+            ):
+                del self._entries[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: str, doc_ids: List[str]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), list(doc_ids))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def load(self) -> None:
+        if self.path is None or not Path(self.path).exists():
+            return
+        now = self._clock()
+        loaded: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        try:
+            raw: Dict[str, List] = json.loads(Path(self.path).read_text(encoding="utf-8"))
+            # Stored oldest-first, so re-inserting preserves LRU order.
+            for key, (stored_at, ids) in raw.items():
+                if not self._expired(float(stored_at), now):
+                    loaded[str(key)] = (float(stored_at), [str(x) for x in ids])
+        except (OSError, json.JSONDecodeError, TypeError, ValueError, AttributeError):
+            # a corrupt cache file is just a cold cache
+            return
+        with self._lock:
+            self._entries.update(loaded)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        p = Path(self.path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps({k: [t, ids] for k, (t, ids) in self._entries.items()}), encoding="utf-8")
+            os.replace(tmp, p)
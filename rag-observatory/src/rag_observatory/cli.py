@@ -6,7 +6,8 @@ import os
 from pathlib import Path
 from typing import Any, Dict, List
 
-from .demo_pipeline import run_demo
+from .costs import PriceTable
+from .demo_pipeline import demo_retriever, run_demo
 from .report import generate_report_html
 from .schema import validate_trace_dict
 
@@ -45,12 +46,14 @@ def cmd_demo(args: argparse.Namespace) -> int:
     for q in qs[: args.n]:
         m = labels.get(q, {})
         run_demo(q, gold_doc_ids=m.get("gold_doc_ids"), expected_answer_contains=m.get("expected_answer_contains"))
+    demo_retriever().cache.save()
     print(f"wrote demo traces to {os.getenv('RAGOBS_TRACE_DIR', 'workspace/traces')}")
     return 0
 
 
 def cmd_report(args: argparse.Namespace) -> int:
-    out = generate_report_html(args.traces, args.out)
+    prices = PriceTable.load(args.prices) if args.prices else None
+    out = generate_report_html(args.traces, args.out, max_rows=args.max_rows, prices=prices)
     print(f"report written: {out}")
     return 0
 
@@ -86,6 +89,7 @@ def cmd_eval(args: argparse.Namespace) -> int:
             expected_answer_contains=r.get("expected_answer_contains"),
         )
         results.append({"query": q, "answer": answer})
+    demo_retriever().cache.save()
 
     outp = Path(args.out)
     outp.parent.mkdir(parents=True, exist_ok=True)
@@ -105,6 +109,8 @@ def build_parser() -> argparse.ArgumentParser:
     r = sub.add_parser("report", help="Generate single-file HTML report from traces")
     r.add_argument("--traces", default=os.getenv("RAGOBS_TRACE_DIR", "workspace/traces"))
     r.add_argument("--out", default="workspace/report.html")
+    r.add_argument("--max-rows", type=int, default=10_000, help="cap on runs embedded for drill-down (sampled)")
+    r.add_argument("--prices", help="JSON price table (model -> per-1k token prices) for cost sections")
     r.set_defaults(func=cmd_report)
 
     v = sub.add_parser("validate", help="Validate JSONL traces against schema (best-effort)")
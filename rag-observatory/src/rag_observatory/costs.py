@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .metrics import span_token_counts
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Price in currency units (e.g. USD) per 1k tokens."""
+
+    prompt_per_1k: float
+    completion_per_1k: float
+
+
+class PriceTable:
+    """Model name -> price lookup. The `"*"` entry (if any) prices unknown models."""
+
+    def __init__(self, prices: Dict[str, ModelPrice], default: Optional[ModelPrice] = None) -> None:
+        self.prices = dict(prices)
+        self.default = default
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "PriceTable":
+        prices: Dict[str, ModelPrice] = {}
+        default: Optional[ModelPrice] = None
+        for model, p in d.items():
+            mp = ModelPrice(float(p.get("prompt_per_1k", 0.0)), float(p.get("completion_per_1k", 0.0)))
+            if model == "*":
+                default = mp
+            else:
+                prices[model] = mp
+        return cls(prices, default)
+
+    @classmethod
+    def load(cls, path: str) -> "PriceTable":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def price_for(self, model: Optional[str]) -> Optional[ModelPrice]:
+        if model is not None and model in self.prices:
+            return self.prices[model]
+        return self.default
+
+    def cost(self, model: Optional[str], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        p = self.price_for(model)
+        if p is None:
+            return None
+        return (prompt_tokens * p.prompt_per_1k + completion_tokens * p.completion_per_1k) / 1000.0
+
+
+def run_cost(trace: Dict[str, Any], prices: Optional[PriceTable] = None) -> Optional[float]:
+    """Cost of one run: `metrics.cost_usd` if recorded, else priced from span token counts."""
+    recorded = (trace.get("metrics", {}) or {}).get("cost_usd")
+    if isinstance(recorded, (int, float)) and not isinstance(recorded, bool):
+        return float(recorded)
+    if prices is None:
+        return None
+    total: Optional[float] = None
+    for s in trace.get("spans", []):
+        pt, ct = span_token_counts(s)
+        if pt is None and ct is None:
+            continue
+        c = prices.cost((s.get("attrs", {}) or {}).get("model"), pt or 0, ct or 0)
+        if c is not None:
+            total = (total or 0.0) + c
+    return total
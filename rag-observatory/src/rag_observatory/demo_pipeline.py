@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import os
 import random
 import re
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from .tracing import trace_run
+from .cache import RetrievalCache
+from .tracing import SpanHandle, trace_run
 
 
 _WORD = re.compile(r"[a-zA-Z0-9]+")
+DEMO_MODEL = "demo-mock"
 
 
 def _tokenize(s: str) -> List[str]:
@@ -40,6 +44,56 @@ class SimpleRetriever:
         return [d for _, d in scored[:top_k]]
 
 
+class _DemoRetriever(SimpleRetriever):
+    def retrieve(self, query: str, top_k: int = 5) -> List[Doc]:
+        time.sleep(random.uniform(0.01, 0.05))  # emulate work
+        return super().retrieve(query, top_k=top_k)
+
+
+def cache_key(query: str, top_k: int) -> str:
+    # SimpleRetriever scores on the token *set*, so order/case/punctuation don't change results.
+    return f"{top_k}:{' '.join(sorted(set(_tokenize(query))))}"
+
+
+class CachedRetriever:
+    """Wraps a retriever with a `RetrievalCache`; records `cache_hit`/`cache_lookup_ms` on the span."""
+
+    def __init__(self, retriever: SimpleRetriever, cache: Optional[RetrievalCache] = None) -> None:
+        self.retriever = retriever
+        self.cache = cache if cache is not None else RetrievalCache()
+        self._by_id = {d.id: d for d in retriever.docs}
+
+    def retrieve(self, query: str, top_k: int = 5, span: Optional[SpanHandle] = None) -> List[Doc]:
+        key = cache_key(query, top_k)
+        t0 = time.perf_counter()
+        # ids pointing at docs that no longer exist are stale: evicted and counted as a miss
+        ids = self.cache.get(key, valid=lambda xs: all(i in self._by_id for i in xs))
+        docs = [self._by_id[i] for i in ids] if ids is not None else None
+        lookup_ms = (time.perf_counter() - t0) * 1000.0
+        if span is not None:
+            span.set("cache_hit", docs is not None)
+            span.set("cache_lookup_ms", round(lookup_ms, 3))
+        if docs is None:
+            docs = self.retriever.retrieve(query, top_k=top_k)
+            self.cache.put(key, [d.id for d in docs])
+        return docs
+
+
+_demo_retriever: Optional[CachedRetriever] = None
+_demo_retriever_lock = threading.Lock()
+
+
+def demo_retriever() -> CachedRetriever:
+    """Process-wide cached demo retriever; set RAGOBS_RETRIEVAL_CACHE to persist it to a file."""
+    global _demo_retriever
+    if _demo_retriever is None:
+        with _demo_retriever_lock:
+            if _demo_retriever is None:
+                cache = RetrievalCache(path=os.getenv("RAGOBS_RETRIEVAL_CACHE") or None)
+                _demo_retriever = CachedRetriever(_DemoRetriever(_load_demo_docs()), cache)
+    return _demo_retriever
+
+
 def _load_demo_docs() -> List[Doc]:
     kb = Path(__file__).resolve().parents[2] / "docs" / "knowledge_base"
     docs: List[Doc] = []
@@ -48,6 +102,11 @@ def _load_demo_docs() -> List[Doc]:
     return docs
 
 
+def _build_prompt(query: str, docs: List[Doc]) -> str:
+    context = "\n\n".join(d.text for d in docs)
+    return f"Answer using the context.\n\n{context}\n\nQuestion: {query}"
+
+
 def _mock_generate_answer(query: str, docs: List[Doc]) -> str:
     # Deterministic, no external calls. Summarizes with a silly but stable heuristic.
     if not docs:
@@ -56,9 +115,13 @@ def _mock_generate_answer(query: str, docs: List[Doc]) -> str:
     return f"Based on the retrieved context, here's the key point: {first}"
 
 
-def run_demo(query: str, gold_doc_ids: List[str] | None = None, expected_answer_contains: List[str] | None = None) -> str:
-    docs = _load_demo_docs()
-    retriever = SimpleRetriever(docs)
+def run_demo(
+    query: str,
+    gold_doc_ids: List[str] | None = None,
+    expected_answer_contains: List[str] | None = None,
+    retriever: CachedRetriever | None = None,
+) -> str:
+    retriever = retriever or demo_retriever()
 
     meta = {}
     if gold_doc_ids:
@@ -68,15 +131,22 @@ def run_demo(query: str, gold_doc_ids: List[str] | None = None, expected_answer_
 
     with trace_run(query=query, meta=meta) as tr:
         with tr.span("retrieve", top_k=5) as sp:
-            time.sleep(random.uniform(0.01, 0.05))  # emulate work
-            retrieved = retriever.retrieve(query, top_k=5)
+            retrieved = retriever.retrieve(query, top_k=5, span=sp)
             sp.set("retrieved_ids", [d.id for d in retrieved])
             sp.set("retrieved_preview", [d.text[:80] for d in retrieved])
 
         with tr.span("generate") as sp:
+            prompt = _build_prompt(query, retrieved)
             time.sleep(random.uniform(0.02, 0.08))
             answer = _mock_generate_answer(query, retrieved)
             sp.set("answer_chars", len(answer))
+            sp.set_tokens(
+                prompt_tokens=len(_tokenize(prompt)),
+                completion_tokens=len(_tokenize(answer)),
+                prompt_chars=len(prompt),
+                completion_chars=len(answer),
+                model=DEMO_MODEL,
+            )
 
         tr.set_output(answer=answer, citations=[d.id for d in retrieved[:2]])
 
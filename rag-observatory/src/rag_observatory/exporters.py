@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import atexit
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import queue
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from .metrics import as_count
+from .schema import Trace
+from .tracing import trace_jsonl_path
+
+
+class _NonRetryable(Exception):
+    """Export failure that retrying cannot fix (e.g. HTTP 400/413); the batch is dropped."""
+
+
+class TraceExporter(ABC):
+    """Sends a batch of finished traces somewhere. Raise on failure so the processor can retry."""
+
+    @abstractmethod
+    def export(self, traces: List[Trace]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlExporter(TraceExporter):
+    """Same on-disk format as `write_trace_jsonl` (daily rotated files)."""
+
+    def __init__(self, trace_dir: str) -> None:
+        self.trace_dir = trace_dir
+
+    def export(self, traces: List[Trace]) -> None:
+        if not traces:
+            return
+        with trace_jsonl_path(self.trace_dir).open("a", encoding="utf-8") as f:
+            f.writelines(json.dumps(t.to_dict(), ensure_ascii=False) + "\n" for t in traces)
+
+
+class StdoutExporter(TraceExporter):
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+
+    def export(self, traces: List[Trace]) -> None:
+        out = self.stream or sys.stdout
+        out.writelines(json.dumps(t.to_dict(), ensure_ascii=False) + "\n" for t in traces)
+        out.flush()
+
+
+class InMemoryExporter(TraceExporter):
+    """Keeps exported traces in a list (tests, notebooks)."""
+
+    def __init__(self) -> None:
+        self.traces: List[Trace] = []
+        self._lock = threading.Lock()
+
+    def export(self, traces: List[Trace]) -> None:
+        with self._lock:
+            self.traces.extend(traces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.traces.clear()
+
+
+# --- OTLP/JSON -------------------------------------------------------------
+
+
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}  # OTLP/JSON encodes int64 as a string
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    if isinstance(v, str):
+        return {"stringValue": v}
+    if isinstance(v, (list, tuple)) and all(isinstance(x, (str, int, float, bool)) for x in v):
+        return {"arrayValue": {"values": [_otlp_value(x) for x in v]}}
+    return {"stringValue": json.dumps(v, ensure_ascii=False, default=str)}
+
+
+def _otlp_attrs(d: Dict[str, Any], prefix: str = "") -> List[Dict[str, Any]]:
+    return [{"key": f"{prefix}{k}", "value": _otlp_value(v)} for k, v in d.items()]
+
+
+_TRACE_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def _hex_id(seed: str, n_bytes: int) -> str:
+    return hashlib.sha256(seed.encode("utf-8")).hexdigest()[: n_bytes * 2]
+
+
+# Errors that mean "this trace can't be encoded" rather than "the collector is unavailable".
+_ENCODE_ERRORS = (TypeError, ValueError, OverflowError, AttributeError)
+
+
+def trace_to_otlp_spans(trace: Trace) -> List[Dict[str, Any]]:
+    """One root span per run (`rag.run`) with a child per recorded span.
+
+    Raises TypeError/ValueError if `trace.ts` isn't an ISO timestamp; non-numeric
+    latencies are treated as 0.
+    """
+    end = datetime.fromisoformat(trace.ts)
+    total_ms = as_count(trace.metrics.get("latency_total_ms")) or 0
+    start_ns = int((end - timedelta(milliseconds=total_ms)).timestamp() * 1e9)
+    # uuid4().hex run ids are valid OTLP trace ids as-is; anything else is hashed into one.
+    trace_id = trace.run_id if _TRACE_ID.fullmatch(trace.run_id) else _hex_id(trace.run_id, 16)
+    root_id = _hex_id(f"{trace.run_id}/root", 8)
+
+    root_attrs = {"rag.query": trace.input.get("query", ""), "rag.answer": trace.output.get("answer", "")}
+    root_attrs.update({f"rag.meta.{k}": v for k, v in (trace.input.get("meta") or {}).items()})
+    root_attrs.update({f"rag.metrics.{k}": v for k, v in trace.metrics.items()})
+    spans = [
+        {
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": "rag.run",
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + total_ms * 1_000_000),
+            "attributes": _otlp_attrs(root_attrs),
+        }
+    ]
+    for i, s in enumerate(trace.spans):
+        spans.append(
+            {
+                "traceId": trace_id,
+                "spanId": _hex_id(f"{trace.run_id}/{i}", 8),
+                "parentSpanId": root_id,
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns + (as_count(s.start_ms) or 0) * 1_000_000),
+                "endTimeUnixNano": str(start_ns + (as_count(s.end_ms) or 0) * 1_000_000),
+                "attributes": _otlp_attrs(s.attrs),
+            }
+        )
+    return spans
+
+
+def traces_to_otlp(traces: List[Trace], service_name: str = "rag-observatory") -> Dict[str, Any]:
+    """Build an OTLP/JSON `ExportTraceServiceRequest` body."""
+    spans: List[Dict[str, Any]] = []
+    for t in traces:
+        spans.extend(trace_to_otlp_spans(t))
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attrs({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "rag_observatory"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class OtlpJsonExporter(TraceExporter):
+    """OTLP/JSON over HTTP (`endpoint`, e.g. http://localhost:4318/v1/traces) or to a JSONL file (`path`).
+
+    Traces are encoded one by one; a trace that can't be encoded is skipped and counted in
+    `skipped` instead of failing its batch. Only transport failures (connection errors,
+    timeouts, HTTP 5xx/408/429) are left for the processor to retry.
+    """
+
+    def __init__(
+        self,
+        *,
+        endpoint: Optional[str] = None,
+        path: Optional[str] = None,
+        service_name: str = "rag-observatory",
+        headers: Optional[Dict[str, str]] = None,
+        timeout_s: float = 10.0,
+    ) -> None:
+        if (endpoint is None) == (path is None):
+            raise ValueError("OtlpJsonExporter needs exactly one of endpoint= or path=")
+        self.endpoint = endpoint
+        self.path = path
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout_s = timeout_s
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _encode(self, traces: List[Trace]) -> Optional[bytes]:
+        frags: List[bytes] = []
+        skipped = 0
+        for t in traces:
+            try:
+                spans = trace_to_otlp_spans(t)
+                frags.append(",".join(json.dumps(s, ensure_ascii=False) for s in spans).encode("utf-8"))
+            except _ENCODE_ERRORS:
+                skipped += 1
+        if skipped:
+            with self._lock:
+                self.skipped += skipped
+        if not frags:
+            return None
+        try:
+            resource = json.dumps({"attributes": _otlp_attrs({"service.name": self.service_name})}, ensure_ascii=False)
+            head = f'{{"resourceSpans":[{{"resource":{resource},"scopeSpans":[{{"scope":{{"name":"rag_observatory"}},"spans":['
+            return head.encode("utf-8") + b",".join(frags) + b"]}]}]}"
+        except _ENCODE_ERRORS as e:
+            raise _NonRetryable(f"cannot encode OTLP envelope: {e}") from e
+
+    def export(self, traces: List[Trace]) -> None:
+        body = self._encode(traces)
+        if body is None:
+            return
+        if self.path is not None:
+            p = Path(self.path)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            with p.open("ab") as f:
+                f.write(body + b"\n")
+            return
+        try:
+            req = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method="POST")
+            with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
+                resp.read()
+        except urllib.error.HTTPError as e:
+            # 4xx means the request itself is bad, except timeout/throttling which may clear up.
+            if e.code in (408, 429) or e.code >= 500:
+                raise
+            raise _NonRetryable(f"collector rejected batch: HTTP {e.code}") from e
+        except OSError:
+            raise  # URLError, timeouts, resets: worth retrying
+        except Exception as e:
+            raise _NonRetryable(f"cannot send OTLP batch: {e}") from e
+
+
+# --- processors --------------------------------------------------------------
+
+
+class TraceProcessor(ABC):
+    """Receives finished traces from `trace_run`."""
+
+    @abstractmethod
+    def on_end(self, trace: Trace) -> None:
+        ...
+
+    def force_flush(self, timeout_s: Optional[float] = None) -> bool:
+        return True
+
+    def shutdown(self, timeout_s: Optional[float] = None) -> None:
+        pass
+
+
+class SimpleProcessor(TraceProcessor):
+    """Exports each trace synchronously on the calling thread (no retries)."""
+
+    def __init__(self, exporter: TraceExporter) -> None:
+        self.exporter = exporter
+
+    def on_end(self, trace: Trace) -> None:
+        self.exporter.export([trace])
+
+    def shutdown(self, timeout_s: Optional[float] = None) -> None:
+        self.exporter.shutdown()
+
+
+class BatchProcessor(TraceProcessor):
+    """Queues traces and exports them in batches from a background thread.
+
+    `on_end` never blocks: once `max_queue_size` traces are waiting, new traces are dropped and
+    counted in `dropped`. At most one batch is held outside the queue (in export/retry), so memory
+    for unsent traces is bounded by `max_queue_size + max_batch_size`.
+    """
+
+    def __init__(
+        self,
+        exporter: TraceExporter,
+        *,
+        max_batch_size: int = 256,
+        flush_interval_s: float = 2.0,
+        max_queue_size: int = 4096,
+        max_retries: int = 3,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 10.0,
+    ) -> None:
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.exported = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._stats_lock = threading.Lock()  # on_end runs on many request threads at once
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue_size)
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._stopping = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="ragobs-batch-export", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _drop(self, n: int) -> None:
+        with self._stats_lock:
+            self.dropped += n
+
+    def on_end(self, trace: Trace) -> None:
+        if self._stopping:
+            self._drop(1)
+            return
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self._drop(1)
+            return
+        if self._queue.qsize() >= self.max_batch_size:
+            with self._cond:
+                self._cond.notify()
+
+    def _take_batch(self) -> List[Trace]:
+        batch: List[Trace] = []
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _export_with_retry(self, batch: List[Trace]) -> None:
+        delay = self.backoff_s
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.exporter.export(batch)
+                self.exported += len(batch)
+                return
+            except _NonRetryable:
+                break
+            except Exception:
+                if attempt == self.max_retries or self._stopping:
+                    break
+                self._stop_event.wait(delay)
+                delay = min(delay * 2, self.max_backoff_s)
+        self.failed_batches += 1
+        self._drop(len(batch))
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                if not (self._stopping or self._flush_requested or self._queue.qsize() >= self.max_batch_size):
+                    self._cond.wait(self.flush_interval_s)
+                stopping = self._stopping
+                self._flush_requested = False
+            while True:
+                with self._cond:
+                    batch = self._take_batch()
+                    self._inflight = len(batch)
+                if not batch:
+                    break
+                self._export_with_retry(batch)
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()
+                if len(batch) < self.max_batch_size and not stopping:
+                    break
+            if stopping and self._queue.empty():
+                return
+
+    def force_flush(self, timeout_s: Optional[float] = None) -> bool:
+        """Ask the worker to export everything queued; True if it drained within the timeout."""
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while not self._queue.empty() or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.1)
+                self._flush_requested = True
+                self._cond.notify_all()
+        return True
+
+    def shutdown(self, timeout_s: Optional[float] = 10.0) -> None:
+        if self._stopping:
+            return
+        self.force_flush(timeout_s)
+        with self._cond:
+            self._stopping = True
+            self._stop_event.set()
+            self._cond.notify_all()
+        self._thread.join(timeout_s)
+        self.exporter.shutdown()
+        atexit.unregister(self.shutdown)
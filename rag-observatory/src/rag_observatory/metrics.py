@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import math
 import statistics
 
 
+# Upper bucket edges (ms) for latency histograms; a final overflow bucket catches the rest.
+LATENCY_BUCKETS_MS: Tuple[int, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+
+
 def _percentile(xs: List[float], p: float) -> float:
     if not xs:
         return float("nan")
@@ -29,10 +34,10 @@ def span_latencies(traces: Iterable[Dict[str, Any]], span_name: str) -> List[int
     return lats
 
 
-def latency_summary_ms(latencies: List[int]) -> Dict[str, float]:
-    if not latencies:
+def value_summary(values: Iterable[float]) -> Dict[str, float]:
+    xs = [float(x) for x in values]
+    if not xs:
         return {"count": 0, "p50": float("nan"), "p95": float("nan"), "p99": float("nan"), "avg": float("nan")}
-    xs = [float(x) for x in latencies]
     return {
         "count": float(len(xs)),
         "p50": _percentile(xs, 0.50),
@@ -42,6 +47,96 @@ def latency_summary_ms(latencies: List[int]) -> Dict[str, float]:
     }
 
 
+def latency_summary_ms(latencies: List[int]) -> Dict[str, float]:
+    return value_summary(latencies)
+
+
+def _nth_from_counts(items: List[Tuple[int, int]], idx: int) -> int:
+    seen = 0
+    for v, c in items:
+        seen += c
+        if idx < seen:
+            return v
+    return items[-1][0]
+
+
+def latency_summary_from_counts(counts: Dict[int, int]) -> Dict[str, float]:
+    """Same result as `latency_summary_ms`, from a {latency_ms: occurrences} map.
+
+    Integer latencies repeat heavily, so the map stays small however many runs are counted.
+    """
+    items = sorted((v, c) for v, c in counts.items() if c > 0)
+    n = sum(c for _, c in items)
+    if not n:
+        return {"count": 0, "p50": float("nan"), "p95": float("nan"), "p99": float("nan"), "avg": float("nan")}
+
+    def pct(p: float) -> float:
+        k = (n - 1) * p
+        f = math.floor(k)
+        c = math.ceil(k)
+        if f == c:
+            return float(_nth_from_counts(items, int(k)))
+        return float(_nth_from_counts(items, f) * (c - k) + _nth_from_counts(items, c) * (k - f))
+
+    return {
+        "count": float(n),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "avg": float(sum(v * c for v, c in items)) / n,
+    }
+
+
+def bucket_index(value: float, edges: Sequence[float] = LATENCY_BUCKETS_MS) -> int:
+    """Index of the histogram bucket for `value` (bucket i holds edges[i-1] <= v < edges[i])."""
+    return bisect_right(edges, value)
+
+
+def as_count(v: Any) -> Optional[int]:
+    """`v` as an int if it is a finite real number (not bool), else None."""
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    return int(v)
+
+
+def span_token_counts(span: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt_tokens, completion_tokens) from span attrs; None where not recorded."""
+    attrs = span.get("attrs", {}) or {}
+    return as_count(attrs.get("prompt_tokens")), as_count(attrs.get("completion_tokens"))
+
+
+def span_tokens_per_second(span: Dict[str, Any]) -> Optional[float]:
+    """Completion throughput of a span (tokens/sec), or None without tokens or duration."""
+    _, ct = span_token_counts(span)
+    dur = int(span.get("end_ms", 0)) - int(span.get("start_ms", 0))
+    if ct is None or dur <= 0:
+        return None
+    return ct / (dur / 1000.0)
+
+
+def span_ms_per_1k_tokens(span: Dict[str, Any]) -> Optional[float]:
+    """Span latency normalized by total (prompt + completion) tokens."""
+    pt, ct = span_token_counts(span)
+    total = (pt or 0) + (ct or 0)
+    if total <= 0:
+        return None
+    dur = max(0, int(span.get("end_ms", 0)) - int(span.get("start_ms", 0)))
+    return dur / (total / 1000.0)
+
+
+def token_throughput(traces: Iterable[Dict[str, Any]], span_name: str = "generate") -> List[float]:
+    out: List[float] = []
+    for t in traces:
+        for s in t.get("spans", []):
+            if s.get("name") == span_name:
+                v = span_tokens_per_second(s)
+                if v is not None:
+                    out.append(v)
+    return out
+
+
 def retrieval_ids(trace: Dict[str, Any]) -> List[str]:
     for s in trace.get("spans", []):
         if s.get("name") == "retrieve":
@@ -1,153 +1,491 @@
 from __future__ import annotations
 
+import heapq
 import html
 import json
+import random
+from array import array
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
-from .metrics import aggregate_quality, latency_summary_ms, span_latencies
+from .costs import PriceTable, run_cost
+from .metrics import (
+    LATENCY_BUCKETS_MS,
+    answer_contains_checks,
+    bucket_index,
+    hit_at_k,
+    latency_summary_from_counts,
+    reciprocal_rank,
+    span_ms_per_1k_tokens,
+    span_tokens_per_second,
+    value_summary,
+)
 
 
-def _read_traces(traces_dir: str) -> List[Dict[str, Any]]:
+SPAN_NAMES = ("retrieve", "rerank", "generate")
+SLOW_RUN_MS = 2000
+MAX_TABLE_ROWS = 50
+DEFAULT_MAX_ROWS = 10_000
+# Distinct queries tracked for "top cost drivers"; the cheapest half is dropped when exceeded.
+MAX_COST_QUERIES = 100_000
+
+
+def _iter_traces(traces_dir: str) -> Iterator[Dict[str, Any]]:
     p = Path(traces_dir)
-    traces: List[Dict[str, Any]] = []
     if not p.exists():
-        return traces
+        return
     for f in sorted(p.glob("*.jsonl")):
-        for line in f.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                traces.append(json.loads(line))
-            except json.JSONDecodeError:
-                # skip broken line; report will highlight via validate command
-                continue
-    return traces
+        with f.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # skip broken line; report will highlight via validate command
+                    continue
 
 
-def generate_report_html(traces_dir: str, out_path: str) -> Path:
-    traces = _read_traces(traces_dir)
-    retrieve_lat = span_latencies(traces, "retrieve")
-    rerank_lat = span_latencies(traces, "rerank")
-    gen_lat = span_latencies(traces, "generate")
+def _read_traces(traces_dir: str) -> List[Dict[str, Any]]:
+    return list(_iter_traces(traces_dir))
 
-    sums = {
-        "runs": len(traces),
-        "retrieve": latency_summary_ms(retrieve_lat),
-        "rerank": latency_summary_ms(rerank_lat),
-        "generate": latency_summary_ms(gen_lat),
-        "quality_k5": aggregate_quality(traces, k=5),
-    }
 
-    # "slow runs" heuristic
-    slow = []
-    for t in traces:
-        total = (t.get("metrics", {}) or {}).get("latency_total_ms")
+def _retrieval_miss(t: Dict[str, Any], k: int = 5) -> bool:
+    gold = (t.get("input", {}) or {}).get("meta", {}).get("gold_doc_ids")
+    if not isinstance(gold, list) or not gold:
+        return False
+    retrieved = None
+    for s in t.get("spans", []):
+        if s.get("name") == "retrieve":
+            retrieved = s.get("attrs", {}).get("retrieved_ids", [])
+            break
+    if not isinstance(retrieved, list):
+        return False
+    gold_s = set(map(str, gold))
+    return not any(str(x) in gold_s for x in retrieved[:k])
+
+
+class _ReportStats:
+    """Single-pass accumulator.
+
+    Span latencies (including the cache hit/miss split) are kept as exact {ms: count} maps, so
+    percentiles need no per-run storage. What still grows with the number of runs:
+    `gen_tokens_per_s`, `gen_ms_per_1k`, `run_costs` and `cache_lookup_ms` (one float per
+    run/span with token, cost or cache-lookup data) and `cost_by_query` (capped at
+    MAX_COST_QUERIES entries).
+    """
+
+    def __init__(
+        self, max_rows: int = DEFAULT_MAX_ROWS, seed: int = 0, prices: Optional[PriceTable] = None
+    ) -> None:
+        self.runs = 0
+        self.latencies: Dict[str, Dict[int, int]] = {n: {} for n in SPAN_NAMES}
+        self.histograms: Dict[str, List[int]] = {
+            n: [0] * (len(LATENCY_BUCKETS_MS) + 1) for n in ("total",) + SPAN_NAMES
+        }
+        self._quality: Dict[str, List[float]] = {"hit_at_k": [0.0, 0], "mrr": [0.0, 0], "answer_contains": [0.0, 0]}
+        self.slow_count = 0
+        self._slow: List[Tuple[int, int, str, str]] = []  # min-heap of (total_ms, seq, run_id, query)
+        self.miss_count = 0
+        self.misses: List[Tuple[str, str]] = []
+        self.max_rows = max_rows
+        self.rows: List[List[Any]] = []
+        self._rng = random.Random(seed)
+        self.prices = prices
+        self.gen_tokens_per_s = array("d")
+        self.gen_ms_per_1k = array("d")
+        self.run_costs = array("d")
+        self.tokens_total = 0
+        self.cost_by_query: Dict[str, List[float]] = {}  # query -> [cost sum, runs]
+        self.cache_hit_lat: Dict[int, int] = {}
+        self.cache_miss_lat: Dict[int, int] = {}
+        self.cache_lookup_ms = array("d")
+
+    def add(self, t: Dict[str, Any]) -> None:
+        self.runs += 1
+        run_id = str(t.get("run_id", "?"))
+        query = (t.get("input", {}) or {}).get("query", "")
+        if not isinstance(query, str):
+            query = str(query)
+
+        per_span: Dict[str, int] = {}
+        for s in t.get("spans", []):
+            name = s.get("name")
+            if name not in self.latencies:
+                continue
+            d = max(0, int(s.get("end_ms", 0)) - int(s.get("start_ms", 0)))
+            lat = self.latencies[name]
+            lat[d] = lat.get(d, 0) + 1
+            self.histograms[name][bucket_index(d)] += 1
+            per_span[name] = per_span.get(name, 0) + d
+            if name == "retrieve":
+                attrs = s.get("attrs", {}) or {}
+                hit = attrs.get("cache_hit")
+                if isinstance(hit, bool):
+                    cl = self.cache_hit_lat if hit else self.cache_miss_lat
+                    cl[d] = cl.get(d, 0) + 1
+                    lk = attrs.get("cache_lookup_ms")
+                    if isinstance(lk, (int, float)) and not isinstance(lk, bool):
+                        self.cache_lookup_ms.append(float(lk))
+            elif name == "generate":
+                tps = span_tokens_per_second(s)
+                if tps is not None:
+                    self.gen_tokens_per_s.append(tps)
+                mpk = span_ms_per_1k_tokens(s)
+                if mpk is not None:
+                    self.gen_ms_per_1k.append(mpk)
+
+        m = t.get("metrics", {}) or {}
+        for key in ("prompt_tokens", "completion_tokens"):
+            v = m.get(key)
+            if isinstance(v, int) and not isinstance(v, bool):
+                self.tokens_total += v
+        cost = run_cost(t, self.prices)
+        if cost is not None:
+            self.run_costs.append(cost)
+            self._add_query_cost(query[:160], cost)
+
+        total_i: Optional[int]
         try:
-            total_i = int(total)
+            total_i = int(m.get("latency_total_ms"))
         except Exception:
-            continue
-        if total_i >= 2000:
-            slow.append((t.get("run_id", "?"), total_i, (t.get("input", {}) or {}).get("query", "")))
-
-    # retrieval misses
-    misses = []
-    for t in traces:
-        gold = (t.get("input", {}) or {}).get("meta", {}).get("gold_doc_ids")
-        if not isinstance(gold, list) or not gold:
-            continue
-        retrieved = None
-        for s in t.get("spans", []):
-            if s.get("name") == "retrieve":
-                retrieved = s.get("attrs", {}).get("retrieved_ids", [])
-                break
-        if isinstance(retrieved, list):
-            if not any(str(x) in set(map(str, gold)) for x in retrieved[:5]):
-                misses.append((t.get("run_id","?"), (t.get("input", {}) or {}).get("query","")))
-
-    # HTML
-    def fmt_summary(label: str, d: Dict[str, Any]) -> str:
-        return f"""<div class='card'>
+            total_i = None
+        if total_i is not None:
+            self.histograms["total"][bucket_index(total_i)] += 1
+            if total_i >= SLOW_RUN_MS:
+                self.slow_count += 1
+                item = (total_i, self.runs, run_id, query[:120])
+                if len(self._slow) < MAX_TABLE_ROWS:
+                    heapq.heappush(self._slow, item)
+                else:
+                    heapq.heappushpop(self._slow, item)
+
+        hit = hit_at_k(t, 5)
+        for key, v in (("hit_at_k", hit), ("mrr", reciprocal_rank(t)), ("answer_contains", answer_contains_checks(t))):
+            if v is not None:
+                acc = self._quality[key]
+                acc[0] += v
+                acc[1] += 1
+
+        if _retrieval_miss(t):
+            self.miss_count += 1
+            if len(self.misses) < MAX_TABLE_ROWS:
+                self.misses.append((run_id, query[:160]))
+
+        row = [
+            run_id,
+            str(t.get("ts", "")),
+            total_i,
+            per_span.get("retrieve"),
+            per_span.get("rerank"),
+            per_span.get("generate"),
+            hit,
+            query[:160],
+        ]
+        # Reservoir sampling keeps the embedded dataset (and thus file size) bounded.
+        if len(self.rows) < self.max_rows:
+            self.rows.append(row)
+        else:
+            j = self._rng.randrange(self.runs)
+            if j < self.max_rows:
+                self.rows[j] = row
+
+    def _add_query_cost(self, query: str, cost: float) -> None:
+        acc = self.cost_by_query.get(query)
+        if acc is None:
+            if len(self.cost_by_query) >= MAX_COST_QUERIES:
+                keep = sorted(self.cost_by_query.items(), key=lambda kv: -kv[1][0])[: MAX_COST_QUERIES // 2]
+                self.cost_by_query = dict(keep)
+            self.cost_by_query[query] = [cost, 1]
+        else:
+            acc[0] += cost
+            acc[1] += 1
+
+    def top_cost_queries(self, n: int = 20) -> List[Tuple[str, float, int]]:
+        top = heapq.nlargest(n, self.cost_by_query.items(), key=lambda kv: kv[1][0])
+        return [(q, c, int(k)) for q, (c, k) in top]
+
+    def quality(self) -> Dict[str, float]:
+        out = {k: (s / n if n else float("nan")) for k, (s, n) in self._quality.items()}
+        out["labeled_runs"] = float(max(n for _, n in self._quality.values()))
+        return out
+
+    def slow_runs(self) -> List[Tuple[str, int, str]]:
+        return [(rid, tot, q) for tot, _, rid, q in sorted(self._slow, key=lambda x: (-x[0], x[1]))]
+
+
+def _svg_histogram(label: str, counts: List[int]) -> str:
+    w, h, pad = 360, 140, 22
+    n = len(counts)
+    peak = max(counts) or 1
+    bw = (w - 2 * pad) / n
+    edges = ["0"] + [str(e) for e in LATENCY_BUCKETS_MS]
+    bars: List[str] = []
+    for i, c in enumerate(counts):
+        bh = (h - 2 * pad) * c / peak
+        lo = edges[i]
+        hi = str(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else "∞"
+        bars.append(
+            f"<rect x='{pad + i * bw:.1f}' y='{h - pad - bh:.1f}' width='{bw - 2:.1f}' height='{bh:.1f}'>"
+            f"<title>{lo}–{hi} ms: {c}</title></rect>"
+        )
+    ticks = "".join(
+        f"<text x='{pad + i * bw:.1f}' y='{h - 6}'>{edges[i]}</text>" for i in range(0, n, 3)
+    )
+    return f"""<div class='card'>
   <div class='h'>{html.escape(label)}</div>
-  <div class='kv'>count <b>{int(d.get('count',0))}</b></div>
-  <div class='kv'>p50 <b>{d.get('p50')}</b> ms</div>
-  <div class='kv'>p95 <b>{d.get('p95')}</b> ms</div>
-  <div class='kv'>p99 <b>{d.get('p99')}</b> ms</div>
-  <div class='kv'>avg <b>{d.get('avg')}</b> ms</div>
+  <svg class='hist' viewBox='0 0 {w} {h}' width='100%' role='img'>{''.join(bars)}{ticks}</svg>
 </div>"""
 
-    q = sums["quality_k5"]
-    quality_html = f"""<div class='card'>
-  <div class='h'>Quality (labeled runs)</div>
-  <div class='kv'>hit@5 <b>{q.get('hit_at_k')}</b></div>
-  <div class='kv'>MRR <b>{q.get('mrr')}</b></div>
-  <div class='kv'>answer_contains <b>{q.get('answer_contains')}</b></div>
-  <div class='kv'>labeled <b>{int(q.get('labeled_runs',0))}</b></div>
+
+def _fmt_summary(label: str, d: Dict[str, Any], unit: str = "ms") -> str:
+    return f"""<div class='card'>
+  <div class='h'>{html.escape(label)}</div>
+  <div class='kv'>count <b>{int(d.get('count',0))}</b></div>
+  <div class='kv'>p50 <b>{d.get('p50')}</b> {unit}</div>
+  <div class='kv'>p95 <b>{d.get('p95')}</b> {unit}</div>
+  <div class='kv'>p99 <b>{d.get('p99')}</b> {unit}</div>
+  <div class='kv'>avg <b>{d.get('avg')}</b> {unit}</div>
 </div>"""
 
-    slow_rows = "".join(
-        f"<tr><td>{html.escape(rid)}</td><td>{tot}</td><td>{html.escape(q[:120])}</td></tr>"
-        for rid, tot, q in sorted(slow, key=lambda x: -x[1])[:50]
+
+def _write_cache_section(f: TextIO, stats: _ReportStats) -> None:
+    hits, misses = sum(stats.cache_hit_lat.values()), sum(stats.cache_miss_lat.values())
+    if not hits + misses:
+        return
+    f.write(f"""
+<h2>Retrieval cache</h2>
+<div class="muted">lookups: <b>{hits + misses}</b> • hits: <b>{hits}</b> • hit rate: <b>{hits / (hits + misses):.1%}</b></div>
+<div class="grid">
+""")
+    f.write(_fmt_summary("retrieve (cache hit)", latency_summary_from_counts(stats.cache_hit_lat)) + "\n")
+    f.write(_fmt_summary("retrieve (cache miss)", latency_summary_from_counts(stats.cache_miss_lat)) + "\n")
+    f.write(_fmt_summary("cache lookup", value_summary(stats.cache_lookup_ms)) + "\n")
+    f.write("</div>\n")
+
+
+def _write_cost_section(f: TextIO, stats: _ReportStats) -> None:
+    f.write("\n<h2>Tokens &amp; cost</h2>\n")
+    if not (stats.gen_tokens_per_s or stats.gen_ms_per_1k or stats.run_costs):
+        f.write(
+            '<div class="muted">no token data — record it with <code>sp.set_tokens(...)</code> '
+            "on the generate span</div>\n"
+        )
+        return
+    total_cost = sum(stats.run_costs)
+    f.write(
+        f'<div class="muted">tokens recorded: <b>{stats.tokens_total}</b> • '
+        f"total cost: <b>{total_cost:.4f}</b></div>\n"
     )
-    miss_rows = "".join(
-        f"<tr><td>{html.escape(rid)}</td><td>{html.escape(q[:160])}</td></tr>"
-        for rid, q in misses[:50]
+    f.write('<div class="grid">\n')
+    f.write(_fmt_summary("generate throughput", value_summary(stats.gen_tokens_per_s), "tok/s") + "\n")
+    f.write(_fmt_summary("generate latency per 1k tokens", value_summary(stats.gen_ms_per_1k)) + "\n")
+    f.write(_fmt_summary("cost per run", value_summary(stats.run_costs), "") + "\n")
+    f.write("</div>\n")
+    rows = "".join(
+        f"<tr><td>{html.escape(q)}</td><td>{c:.4f}</td><td>{k}</td><td>{c / k:.4f}</td></tr>"
+        for q, c, k in stats.top_cost_queries()
     )
+    f.write(f"""<h3>Top cost drivers by query</h3>
+<table>
+  <thead><tr><th>query</th><th>total cost</th><th>runs</th><th>cost/run</th></tr></thead>
+  <tbody>{rows or '<tr><td colspan="4" class="muted">none</td></tr>'}</tbody>
+</table>
+""")
 
-    out = f"""<!doctype html>
+
+_HEAD = """<!doctype html>
 <html>
 <head>
 <meta charset="utf-8"/>
 <title>rag-observatory report</title>
 <style>
-  body {{ font-family: -apple-system, BlinkMacSystemFont, Segoe UI, Roboto, Arial, sans-serif; margin: 24px; }}
-  .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 12px; }}
-  .card {{ border: 1px solid #ddd; border-radius: 14px; padding: 12px 14px; box-shadow: 0 1px 2px rgba(0,0,0,.05); }}
-  .h {{ font-weight: 700; margin-bottom: 8px; }}
-  .kv {{ color: #222; margin: 3px 0; }}
-  table {{ border-collapse: collapse; width: 100%; }}
-  th, td {{ border-bottom: 1px solid #eee; padding: 8px; text-align: left; vertical-align: top; }}
-  th {{ font-size: 12px; color: #666; text-transform: uppercase; letter-spacing: .04em; }}
-  .muted {{ color: #666; font-size: 12px; }}
-  code {{ background: #f6f6f6; padding: 2px 6px; border-radius: 8px; }}
+  body { font-family: -apple-system, BlinkMacSystemFont, Segoe UI, Roboto, Arial, sans-serif; margin: 24px; }
+  .grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 12px; }
+  .card { border: 1px solid #ddd; border-radius: 14px; padding: 12px 14px; box-shadow: 0 1px 2px rgba(0,0,0,.05); }
+  .h { font-weight: 700; margin-bottom: 8px; }
+  .kv { color: #222; margin: 3px 0; }
+  table { border-collapse: collapse; width: 100%; }
+  th, td { border-bottom: 1px solid #eee; padding: 8px; text-align: left; vertical-align: top; }
+  th { font-size: 12px; color: #666; text-transform: uppercase; letter-spacing: .04em; }
+  .muted { color: #666; font-size: 12px; }
+  code { background: #f6f6f6; padding: 2px 6px; border-radius: 8px; }
+  svg.hist rect { fill: #4c78a8; }
+  svg.hist text { font-size: 9px; fill: #666; }
+  #runs-table th { cursor: pointer; }
+  .pager { margin: 8px 0; }
 </style>
 </head>
 <body>
 <h1>rag-observatory report</h1>
-<div class="muted">Traces: <code>{html.escape(traces_dir)}</code> • Runs: <b>{sums['runs']}</b></div>
+"""
 
-<h2>Latency (ms)</h2>
-<div class="grid">
-{fmt_summary('retrieve', sums['retrieve'])}
-{fmt_summary('rerank', sums['rerank'])}
-{fmt_summary('generate', sums['generate'])}
-{quality_html}
+_RUNS_JS = """<script>
+(function () {
+  var rows = JSON.parse(document.getElementById("runs-data").textContent);
+  var cols = ["run_id", "ts", "total_ms", "retrieve_ms", "rerank_ms", "generate_ms", "hit@5", "query"];
+  var pageSize = 50, page = 0, sortCol = -1, sortDir = 1, view = rows;
+  var body = document.querySelector("#runs-table tbody");
+  var info = document.getElementById("runs-info");
+  var head = document.querySelector("#runs-table thead tr");
+  cols.forEach(function (c, i) {
+    var th = document.createElement("th");
+    th.textContent = c;
+    th.onclick = function () { sortDir = sortCol === i ? -sortDir : 1; sortCol = i; apply(); };
+    head.appendChild(th);
+  });
+  function apply() {
+    var q = document.getElementById("runs-search").value.toLowerCase();
+    view = q ? rows.filter(function (r) {
+      return r[0].toLowerCase().indexOf(q) >= 0 || r[7].toLowerCase().indexOf(q) >= 0;
+    }) : rows.slice();
+    if (sortCol >= 0) {
+      view.sort(function (a, b) {
+        var x = a[sortCol], y = b[sortCol];
+        if (x === y) return 0;
+        if (x === null) return 1;
+        if (y === null) return -1;
+        return (x < y ? -1 : 1) * sortDir;
+      });
+    }
+    page = 0;
+    render();
+  }
+  function render() {
+    var pages = Math.max(1, Math.ceil(view.length / pageSize));
+    page = Math.min(Math.max(page, 0), pages - 1);
+    body.textContent = "";
+    view.slice(page * pageSize, (page + 1) * pageSize).forEach(function (r) {
+      var tr = document.createElement("tr");
+      r.forEach(function (v) {
+        var td = document.createElement("td");
+        td.textContent = v === null ? "" : v;
+        tr.appendChild(td);
+      });
+      body.appendChild(tr);
+    });
+    info.textContent = view.length + " rows \\u2022 page " + (page + 1) + " / " + pages;
+  }
+  document.getElementById("runs-search").oninput = apply;
+  document.getElementById("runs-prev").onclick = function () { page--; render(); };
+  document.getElementById("runs-next").onclick = function () { page++; render(); };
+  apply();
+})();
+</script>
+"""
+
+
+def _write_runs_dataset(f: TextIO, rows: List[List[Any]]) -> None:
+    f.write('<script type="application/json" id="runs-data">[')
+    for i, r in enumerate(rows):
+        if i:
+            f.write(",")
+        # Untrusted text inside <script>: "</script>" or "<!--" would change how the HTML parser
+        # tokenizes the block, so escape every markup character (only possible inside JSON strings).
+        f.write(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":"))
+            .replace("<", "\\u003c")
+            .replace(">", "\\u003e")
+            .replace("&", "\\u0026")
+        )
+    f.write("]</script>\n")
+
+
+def generate_report_html(
+    traces_dir: str,
+    out_path: str,
+    *,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    seed: int = 0,
+    prices: Optional[PriceTable] = None,
+) -> Path:
+    """Stream a single-file HTML report; `max_rows` caps the embedded per-run dataset.
+
+    `prices` prices runs that carry token counts but no recorded `metrics.cost_usd`.
+    """
+    stats = _ReportStats(max_rows=max_rows, seed=seed, prices=prices)
+    for t in _iter_traces(traces_dir):
+        stats.add(t)
+
+    outp = Path(out_path)
+    outp.parent.mkdir(parents=True, exist_ok=True)
+    with outp.open("w", encoding="utf-8") as f:
+        f.write(_HEAD)
+        sampled = f" • Sampled for drill-down: <b>{len(stats.rows)}</b>" if len(stats.rows) < stats.runs else ""
+        f.write(
+            f'<div class="muted">Traces: <code>{html.escape(traces_dir)}</code> • '
+            f"Runs: <b>{stats.runs}</b>{sampled}</div>\n"
+        )
+
+        f.write('\n<h2>Latency (ms)</h2>\n<div class="grid">\n')
+        for name in SPAN_NAMES:
+            f.write(_fmt_summary(name, latency_summary_from_counts(stats.latencies[name])) + "\n")
+        q = stats.quality()
+        f.write(f"""<div class='card'>
+  <div class='h'>Quality (labeled runs)</div>
+  <div class='kv'>hit@5 <b>{q.get('hit_at_k')}</b></div>
+  <div class='kv'>MRR <b>{q.get('mrr')}</b></div>
+  <div class='kv'>answer_contains <b>{q.get('answer_contains')}</b></div>
+  <div class='kv'>labeled <b>{int(q.get('labeled_runs',0))}</b></div>
 </div>
+</div>
+""")
+
+        f.write('\n<h2>Latency histograms (ms)</h2>\n<div class="grid">\n')
+        for name in ("total",) + SPAN_NAMES:
+            f.write(_svg_histogram(name, stats.histograms[name]) + "\n")
+        f.write("</div>\n")
 
-<h2>Slow runs (≥ 2000ms total)</h2>
+        _write_cache_section(f, stats)
+        _write_cost_section(f, stats)
+
+        slow_rows = "".join(
+            f"<tr><td>{html.escape(rid)}</td><td>{tot}</td><td>{html.escape(qq)}</td></tr>"
+            for rid, tot, qq in stats.slow_runs()
+        )
+        f.write(f"""
+<h2>Slow runs (≥ {SLOW_RUN_MS}ms total)</h2>
+<div class="muted">{stats.slow_count} total, showing slowest {min(stats.slow_count, MAX_TABLE_ROWS)}</div>
 <table>
   <thead><tr><th>run_id</th><th>total_ms</th><th>query</th></tr></thead>
   <tbody>{slow_rows or '<tr><td colspan="3" class="muted">none</td></tr>'}</tbody>
 </table>
+""")
 
+        miss_rows = "".join(
+            f"<tr><td>{html.escape(rid)}</td><td>{html.escape(qq)}</td></tr>" for rid, qq in stats.misses
+        )
+        f.write(f"""
 <h2>Retrieval misses (gold present, top‑5 missed)</h2>
+<div class="muted">{stats.miss_count} total, showing first {min(stats.miss_count, MAX_TABLE_ROWS)}</div>
 <table>
   <thead><tr><th>run_id</th><th>query</th></tr></thead>
   <tbody>{miss_rows or '<tr><td colspan="2" class="muted">none</td></tr>'}</tbody>
 </table>
+""")
+
+        f.write("""
+<h2>Runs</h2>
+<div class="pager">
+  <input id="runs-search" type="search" placeholder="filter by run_id or query"/>
+  <button id="runs-prev">&larr;</button><button id="runs-next">&rarr;</button>
+  <span id="runs-info" class="muted"></span>
+</div>
+<table id="runs-table"><thead><tr></tr></thead><tbody></tbody></table>
+""")
+        _write_runs_dataset(f, stats.rows)
+        f.write(_RUNS_JS)
 
+        f.write("""
 <h2>How to read this</h2>
 <ul>
   <li>If <b>retrieve p95</b> is high: optimize indexing, caching, or reduce top‑k.</li>
   <li>If <b>hit@5</b> is low: fix chunking, embeddings, or query rewrite.</li>
   <li>If <b>generate p95</b> is high: shorten prompts, stream, or switch model.</li>
+  <li>If <b>latency per 1k tokens</b> is flat but <b>generate p95</b> is high: prompts are too long.</li>
 </ul>
 
 </body>
-</html>"""
-
-    outp = Path(out_path)
-    outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text(out, encoding="utf-8")
+</html>""")
     return outp
@@ -8,10 +8,18 @@ from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
+from .metrics import as_count
 from .schema import SCHEMA_VERSION, Span, Trace
 
+if TYPE_CHECKING:
+    from .costs import PriceTable
+    from .exporters import TraceProcessor
+
+
+_default_processor: Optional["TraceProcessor"] = None
+
 
 def _now_iso_utc() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -35,6 +43,28 @@ class SpanHandle:
         for k, v in kwargs.items():
             self._attrs[k] = v
 
+    def set_tokens(
+        self,
+        *,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        prompt_chars: Optional[int] = None,
+        completion_chars: Optional[int] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        """Record token/size counters as span attrs (only the ones given)."""
+        a = self._attrs
+        if prompt_tokens is not None:
+            a["prompt_tokens"] = prompt_tokens
+        if completion_tokens is not None:
+            a["completion_tokens"] = completion_tokens
+        if prompt_chars is not None:
+            a["prompt_chars"] = prompt_chars
+        if completion_chars is not None:
+            a["completion_chars"] = completion_chars
+        if model is not None:
+            a["model"] = model
+
     def end(self) -> None:
         end_ms = _ms_since(self._tracer._t0)
         self._tracer._spans.append(Span(name=self._name, start_ms=self._start_ms, end_ms=end_ms, attrs=self._attrs))
@@ -51,8 +81,15 @@ class SpanHandle:
 class Tracer:
     """In-memory trace builder for a single run."""
 
-    def __init__(self, query: str, meta: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        query: str,
+        meta: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
+        prices: Optional["PriceTable"] = None,
+    ) -> None:
         self.run_id = run_id or uuid.uuid4().hex
+        self._prices = prices
         self._t0 = time.perf_counter()
         self._input: Dict[str, Any] = {"query": query, "meta": meta or {}}
         self._spans: List[Span] = []
@@ -76,9 +113,35 @@ class Tracer:
     def set_metric(self, key: str, value: Any) -> None:
         self._metrics[key] = value
 
+    def _rollup_tokens(self) -> None:
+        prompt = completion = 0
+        cost: Optional[float] = None
+        seen = False
+        for s in self._spans:
+            # Attrs can hold anything a provider returned; skip non-numeric counts rather than
+            # raising inside trace_run's finally and losing the trace.
+            pt = as_count(s.attrs.get("prompt_tokens"))
+            ct = as_count(s.attrs.get("completion_tokens"))
+            if pt is None and ct is None:
+                continue
+            seen = True
+            prompt += pt or 0
+            completion += ct or 0
+            if self._prices is not None:
+                c = self._prices.cost(s.attrs.get("model"), pt or 0, ct or 0)
+                if c is not None:
+                    cost = (cost or 0.0) + c
+        if not seen:
+            return
+        self._metrics.setdefault("prompt_tokens", prompt)
+        self._metrics.setdefault("completion_tokens", completion)
+        if cost is not None:
+            self._metrics.setdefault("cost_usd", cost)
+
     def finalize(self) -> Trace:
         total_ms = _ms_since(self._t0)
         self._metrics.setdefault("latency_total_ms", total_ms)
+        self._rollup_tokens()
         return Trace(
             schema_version=SCHEMA_VERSION,
             run_id=self.run_id,
@@ -90,16 +153,31 @@ class Tracer:
         )
 
 
-def write_trace_jsonl(trace: Trace, trace_dir: str) -> Path:
+def trace_jsonl_path(trace_dir: str) -> Path:
+    """Today's (UTC) JSONL file under `trace_dir`, creating the directory if needed."""
     out_dir = Path(trace_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     day = datetime.now(timezone.utc).strftime("%Y%m%d")
-    path = out_dir / f"traces-{day}.jsonl"
+    return out_dir / f"traces-{day}.jsonl"
+
+
+def write_trace_jsonl(trace: Trace, trace_dir: str) -> Path:
+    path = trace_jsonl_path(trace_dir)
     with path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
     return path
 
 
+def set_trace_processor(processor: Optional["TraceProcessor"]) -> Optional["TraceProcessor"]:
+    """Route `trace_run` output through `processor` (None restores direct JSONL writes).
+
+    Returns the previously installed processor so callers can shut it down.
+    """
+    global _default_processor
+    prev, _default_processor = _default_processor, processor
+    return prev
+
+
 @contextmanager
 def trace_run(
     query: str,
@@ -107,12 +185,22 @@ def trace_run(
     meta: Optional[Dict[str, Any]] = None,
     run_id: Optional[str] = None,
     trace_dir: Optional[str] = None,
+    prices: Optional["PriceTable"] = None,
+    processor: Optional["TraceProcessor"] = None,
 ) -> Iterator[Tracer]:
-    """Context manager that auto-writes the trace as JSONL on exit."""
-    tracer = Tracer(query=query, meta=meta, run_id=run_id)
+    """Context manager that auto-writes the trace on exit.
+
+    The trace goes to `processor` (or the one installed with `set_trace_processor`);
+    without either it is appended as JSONL under `trace_dir`.
+    """
+    tracer = Tracer(query=query, meta=meta, run_id=run_id, prices=prices)
     try:
         yield tracer
     finally:
-        td = trace_dir or os.getenv("RAGOBS_TRACE_DIR", "workspace/traces")
         trace = tracer.finalize()
-        write_trace_jsonl(trace, td)
+        proc = processor or _default_processor
+        if proc is not None:
+            proc.on_end(trace)
+        else:
+            td = trace_dir or os.getenv("RAGOBS_TRACE_DIR", "workspace/traces")
+            write_trace_jsonl(trace, td)
@@ -0,0 +1,105 @@
+import json
+import random
+import sys
+import threading
+from pathlib import Path
+
+from rag_observatory.cache import RetrievalCache
+from rag_observatory.demo_pipeline import CachedRetriever, Doc, SimpleRetriever, cache_key, run_demo
+from rag_observatory.report import generate_report_html
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_and_ttl_eviction():
+    clock = _Clock()
+    c = RetrievalCache(max_entries=2, ttl_s=10, clock=clock)
+    c.put("a", ["d1"])
+    c.put("b", ["d2"])
+    assert c.get("a") == ["d1"]  # a is now most recent
+    c.put("c", ["d3"])
+    assert c.get("b") is None and len(c) == 2
+    clock.now += 11
+    assert c.get("a") is None
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_persistence_roundtrip(tmp_path: Path):
+    path = str(tmp_path / "cache.json")
+    clock = _Clock()
+    c = RetrievalCache(ttl_s=10, path=path, clock=clock)
+    c.put("fresh", ["d1"])
+    c.put("old", ["d2"])
+    c.save()
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    raw["old"][0] -= 100
+    Path(path).write_text(json.dumps(raw), encoding="utf-8")
+
+    c2 = RetrievalCache(ttl_s=10, path=path, clock=clock)
+    assert c2.get("fresh") == ["d1"]
+    assert c2.get("old") is None
+
+
+def test_corrupt_cache_file_is_cold(tmp_path: Path):
+    path = tmp_path / "cache.json"
+    for bad in ("[1, 2]", '{"k": 5}', '{"k": ["x", ["d1"]]}', '{"k": [1.0]}', "{nope"):
+        path.write_text(bad, encoding="utf-8")
+        assert len(RetrievalCache(path=str(path))) == 0
+
+
+def test_concurrent_get_put():
+    c = RetrievalCache(max_entries=4, ttl_s=60)
+    errors = []
+
+    def worker(n: int) -> None:
+        rng = random.Random(n)
+        try:
+            for _ in range(20000):
+                key = str(rng.randrange(6))
+                if c.get(key) is None:
+                    c.put(key, [key])
+        except Exception as e:  # pragma: no cover - the failure we're guarding against
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # force frequent thread switches so races actually show up
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(old)
+    assert errors == []
+    assert len(c) == 4
+    assert c.hits + c.misses == 8 * 20000
+
+
+def test_stale_ids_count_as_miss():
+    r = CachedRetriever(SimpleRetriever([Doc("d1", "rag retrieval")]))
+    r.cache.put(cache_key("rag", 5), ["gone"])
+    docs = r.retrieve("rag", top_k=5)
+    assert [d.id for d in docs] == ["d1"]
+    assert (r.cache.hits, r.cache.misses) == (0, 1)
+
+
+def test_cached_retriever_traces_hits(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("RAGOBS_TRACE_DIR", str(tmp_path / "traces"))
+    assert cache_key("What is RAG?", 5) == cache_key("rag is what", 5)
+
+    r = CachedRetriever(SimpleRetriever([Doc("d1", "rag retrieval"), Doc("d2", "chunking")]))
+    run_demo("What is RAG?", retriever=r)
+    run_demo("what is rag", retriever=r)
+    lines = next((tmp_path / "traces").glob("*.jsonl")).read_text(encoding="utf-8").splitlines()
+    hits = [json.loads(x)["spans"][0]["attrs"]["cache_hit"] for x in lines]
+    assert hits == [False, True]
+
+    doc = generate_report_html(str(tmp_path / "traces"), str(tmp_path / "r.html")).read_text(encoding="utf-8")
+    assert "Retrieval cache" in doc and "hit rate: <b>50.0%</b>" in doc
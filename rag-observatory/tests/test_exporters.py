@@ -0,0 +1,224 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+from rag_observatory.exporters import (
+    BatchProcessor,
+    InMemoryExporter,
+    JsonlExporter,
+    OtlpJsonExporter,
+    TraceExporter,
+    TraceProcessor,
+    trace_to_otlp_spans,
+    traces_to_otlp,
+)
+from rag_observatory.tracing import trace_run
+
+
+def _run(processor, q="q"):
+    with trace_run(q, processor=processor) as tr:
+        with tr.span("retrieve", top_k=2) as sp:
+            sp.set("retrieved_ids", ["d1", "d2"])
+        tr.set_output(answer="a")
+
+
+def test_batch_processor_in_memory():
+    mem = InMemoryExporter()
+    proc = BatchProcessor(mem, max_batch_size=4, flush_interval_s=60)
+    for i in range(10):
+        _run(proc, f"q{i}")
+    assert proc.force_flush(timeout_s=5)
+    proc.shutdown()
+    assert [t.input["query"] for t in mem.traces] == [f"q{i}" for i in range(10)]
+    assert proc.exported == 10 and proc.dropped == 0
+
+
+class _Flaky(TraceExporter):
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.got = []
+
+    def export(self, traces):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("collector down")
+        self.got.extend(traces)
+
+
+def test_batch_processor_retries_then_drops():
+    ok = _Flaky(failures=2)
+    proc = BatchProcessor(ok, max_retries=3, backoff_s=0.001)
+    _run(proc)
+    proc.shutdown()
+    assert len(ok.got) == 1 and proc.failed_batches == 0
+
+    bad = _Flaky(failures=100)
+    proc = BatchProcessor(bad, max_retries=1, backoff_s=0.001)
+    _run(proc)
+    proc.shutdown()
+    assert bad.calls == 2 and proc.dropped == 1 and proc.failed_batches == 1
+
+
+def test_queue_cap_drops_without_blocking():
+    gate = threading.Event()
+
+    class _Blocked(TraceExporter):
+        def export(self, traces):
+            gate.wait(5)
+
+    proc = BatchProcessor(_Blocked(), max_batch_size=1, max_queue_size=2, flush_interval_s=0.01)
+    for _ in range(20):
+        _run(proc)
+    assert proc.dropped >= 17
+    gate.set()
+    proc.shutdown()
+
+
+def test_jsonl_exporter_matches_trace_run_format(tmp_path: Path):
+    proc = BatchProcessor(JsonlExporter(str(tmp_path)), max_batch_size=2)
+    for i in range(3):
+        _run(proc, f"q{i}")
+    proc.shutdown()
+    lines = next(tmp_path.glob("traces-*.jsonl")).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x)["input"]["query"] for x in lines] == ["q0", "q1", "q2"]
+
+
+def _serve(handler_cls):
+    srv = HTTPServer(("127.0.0.1", 0), handler_cls)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def test_otlp_http_4xx_is_not_retried():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            calls.append(self.path)
+            self.send_response(400)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    srv = _serve(Handler)
+    try:
+        exp = OtlpJsonExporter(endpoint=f"http://127.0.0.1:{srv.server_port}/v1/traces")
+        proc = BatchProcessor(exp, max_retries=5, backoff_s=30)
+        _run(proc)
+        assert proc.force_flush(timeout_s=5)
+        proc.shutdown()
+    finally:
+        srv.shutdown()
+    assert len(calls) == 1
+    assert proc.dropped == 1 and proc.failed_batches == 1
+
+
+def test_otlp_http_exporter_posts_to_local_collector():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            n = int(self.headers["Content-Length"])
+            received.append((self.path, json.loads(self.rfile.read(n))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    srv = _serve(Handler)
+    try:
+        exp = OtlpJsonExporter(endpoint=f"http://127.0.0.1:{srv.server_port}/v1/traces")
+        proc = BatchProcessor(exp, max_batch_size=8)
+        _run(proc)
+        proc.shutdown()
+    finally:
+        srv.shutdown()
+
+    assert len(received) == 1
+    path, body = received[0]
+    assert path == "/v1/traces"
+    spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["rag.run", "retrieve"]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert len(spans[0]["traceId"]) == 32 and len(spans[0]["spanId"]) == 16
+    attrs = {a["key"]: a["value"] for a in spans[1]["attributes"]}
+    assert attrs["top_k"] == {"intValue": "2"}
+    assert attrs["retrieved_ids"]["arrayValue"]["values"][0] == {"stringValue": "d1"}
+
+
+def test_incomplete_exporter_fails_at_construction():
+    class NoExport(TraceExporter):
+        pass
+
+    class NoOnEnd(TraceProcessor):
+        pass
+
+    with pytest.raises(TypeError):
+        NoExport()
+    with pytest.raises(TypeError):
+        NoOnEnd()
+
+
+def test_otlp_trace_id_is_always_hex():
+    mem = InMemoryExporter()
+    proc = BatchProcessor(mem)
+    with trace_run("q", processor=proc, run_id="z" * 32) as tr:
+        tr.set_output(answer="a")
+    with trace_run("q", processor=proc, run_id="ab" * 16) as tr:
+        tr.set_output(answer="a")
+    proc.shutdown()
+    ids = [trace_to_otlp_spans(t)[0]["traceId"] for t in mem.traces]
+    assert ids[0] != "z" * 32 and all(c in "0123456789abcdef" for c in ids[0]) and len(ids[0]) == 32
+    assert ids[1] == "ab" * 16
+
+
+def test_otlp_skips_unencodable_trace_without_losing_batch(tmp_path: Path):
+    out = tmp_path / "otlp.jsonl"
+    exp = OtlpJsonExporter(path=str(out))
+    calls = []
+
+    class Counting(TraceExporter):
+        def export(self, traces):
+            calls.append(len(traces))
+            exp.export(traces)
+
+    proc = BatchProcessor(Counting(), max_batch_size=8, backoff_s=30)
+    for i in range(5):
+        with trace_run(f"q{i}", processor=proc) as tr:
+            if i == 1:
+                tr.set_metric("latency_total_ms", "n/a")
+            if i == 3:
+                tr.set_output(answer="bad \ud800")  # lone surrogate: not UTF-8 encodable
+            else:
+                tr.set_output(answer="a")
+    proc.shutdown()
+
+    assert calls[0] == 5 and proc.failed_batches == 0
+    assert exp.skipped == 1
+    body = json.loads(out.read_text(encoding="utf-8").splitlines()[0])
+    queries = [
+        a["value"]["stringValue"]
+        for s in body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        if s["name"] == "rag.run"
+        for a in s["attributes"]
+        if a["key"] == "rag.query"
+    ]
+    assert queries == ["q0", "q1", "q2", "q4"]
+
+
+def test_otlp_body_matches_traces_to_otlp(tmp_path: Path):
+    mem = InMemoryExporter()
+    proc = BatchProcessor(mem)
+    for i in range(3):
+        _run(proc, f"q{i}")
+    proc.shutdown()
+    out = tmp_path / "otlp.jsonl"
+    OtlpJsonExporter(path=str(out), service_name="svc").export(mem.traces)
+    assert json.loads(out.read_text(encoding="utf-8")) == traces_to_otlp(mem.traces, "svc")
@@ -1,4 +1,15 @@
-from rag_observatory.metrics import hit_at_k, reciprocal_rank, answer_contains_checks
+from rag_observatory.costs import PriceTable, run_cost
+from rag_observatory.metrics import (
+    answer_contains_checks,
+    bucket_index,
+    as_count,
+    hit_at_k,
+    latency_summary_from_counts,
+    latency_summary_ms,
+    reciprocal_rank,
+    span_ms_per_1k_tokens,
+    span_tokens_per_second,
+)
 
 
 def test_quality_metrics():
@@ -12,3 +23,35 @@ def test_quality_metrics():
     assert hit_at_k(t, 2) == 1.0
     assert reciprocal_rank(t) == 0.5
     assert answer_contains_checks(t) == 1.0
+
+
+def test_bucket_index():
+    assert [bucket_index(x, edges=(1, 5)) for x in (0, 1, 3, 5, 10_000_000)] == [0, 1, 1, 2, 2]
+
+
+def test_token_metrics_and_run_cost():
+    s = {"name": "generate", "start_ms": 0, "end_ms": 500, "attrs": {"prompt_tokens": 1500, "completion_tokens": 500, "model": "x"}}
+    assert span_tokens_per_second(s) == 1000.0
+    assert span_ms_per_1k_tokens(s) == 250.0
+    prices = PriceTable.from_dict({"*": {"prompt_per_1k": 0.002, "completion_per_1k": 0.004}})
+    assert abs(run_cost({"spans": [s], "metrics": {}}, prices) - 0.005) < 1e-12
+    assert run_cost({"spans": [s], "metrics": {"cost_usd": 1.5}}, prices) == 1.5
+    assert run_cost({"spans": [s], "metrics": {}}) is None
+
+
+def test_latency_summary_from_counts_matches_list():
+    xs = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 2000]
+    counts = {}
+    for x in xs:
+        counts[x] = counts.get(x, 0) + 1
+    got = latency_summary_from_counts(counts)
+    want = latency_summary_ms(xs)
+    assert got.keys() == want.keys()
+    assert all(abs(got[k] - want[k]) < 1e-9 for k in want)
+    assert latency_summary_from_counts({})["count"] == 0
+
+
+def test_as_count_rejects_non_numbers():
+    assert [as_count(v) for v in (3, 2.7, True, "5", None, float("nan"), float("inf"))] == [
+        3, 2, None, None, None, None, None,
+    ]
@@ -0,0 +1,57 @@
+import json
+from html.parser import HTMLParser
+from pathlib import Path
+
+from rag_observatory.report import generate_report_html
+
+
+def _write(td: Path, n: int) -> None:
+    td.mkdir(parents=True)
+    lines = []
+    for i in range(n):
+        lines.append(json.dumps({
+            "schema_version": 1,
+            "run_id": f"r{i}",
+            "ts": "2026-01-01T00:00:00Z",
+            "input": {"query": f"q{i} <!--<script> </script>", "meta": {"gold_doc_ids": ["d9"]}},
+            "spans": [{"name": "retrieve", "start_ms": 0, "end_ms": 10, "attrs": {"retrieved_ids": ["d1"]}}],
+            "output": {"answer": "a", "citations": []},
+            "metrics": {"latency_total_ms": 2500 if i % 2 else 10},
+        }))
+    (td / "traces-20260101.jsonl").write_text("\n".join(lines) + "\nnot json\n", encoding="utf-8")
+
+
+class _Scripts(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.scripts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            self.scripts.append([dict(attrs), ""])
+
+    def handle_data(self, data):
+        if self.scripts and self.lasttag == "script":
+            self.scripts[-1][1] += data
+
+
+def test_report_sections_and_row_cap(tmp_path: Path):
+    td = tmp_path / "traces"
+    _write(td, 120)
+    out = generate_report_html(str(td), str(tmp_path / "r.html"), max_rows=30)
+    doc = out.read_text(encoding="utf-8")
+    assert "Runs: <b>120</b>" in doc
+    assert "Sampled for drill-down: <b>30</b>" in doc
+    assert "<svg class='hist'" in doc
+    assert "60 total, showing slowest 50" in doc
+
+    parser = _Scripts()
+    parser.feed(doc)
+    assert [a.get("id") for a, _ in parser.scripts] == ["runs-data", None]
+    payload = parser.scripts[0][1]
+    # no markup characters at all, so "<!--<script>" can't switch the tokenizer state
+    assert not set("<>&") & set(payload)
+    rows = json.loads(payload)
+    assert len(rows) == 30
+    assert all(r[7].endswith("<!--<script> </script>") for r in rows)
+    assert "JSON.parse" in parser.scripts[1][1]
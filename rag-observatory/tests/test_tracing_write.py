@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 
+from rag_observatory.costs import PriceTable
 from rag_observatory.tracing import trace_run
 
 
@@ -15,3 +16,29 @@ def test_trace_run_writes_jsonl(tmp_path: Path):
     line = files[0].read_text(encoding="utf-8").splitlines()[0]
     obj = json.loads(line)
     assert obj["input"]["query"] == "q"
+
+
+def test_token_counters_roll_up_with_prices(tmp_path: Path):
+    prices = PriceTable.from_dict({"m": {"prompt_per_1k": 1.0, "completion_per_1k": 2.0}})
+    td = tmp_path / "traces"
+    with trace_run("q", trace_dir=str(td), prices=prices) as tr:
+        with tr.span("generate") as sp:
+            sp.set_tokens(prompt_tokens=1000, completion_tokens=500, model="m")
+        tr.set_output(answer="a")
+    obj = json.loads(next(td.glob("*.jsonl")).read_text(encoding="utf-8").splitlines()[0])
+    assert obj["spans"][0]["attrs"]["model"] == "m"
+    assert obj["metrics"]["prompt_tokens"] == 1000
+    assert obj["metrics"]["completion_tokens"] == 500
+    assert obj["metrics"]["cost_usd"] == 2.0
+
+
+def test_non_numeric_token_counts_do_not_lose_trace(tmp_path: Path):
+    td = tmp_path / "traces"
+    with trace_run("q", trace_dir=str(td)) as tr:
+        with tr.span("generate") as sp:
+            sp.set("prompt_tokens", "n/a")
+            sp.set("completion_tokens", 7)
+        tr.set_output(answer="a")
+    obj = json.loads(next(td.glob("*.jsonl")).read_text(encoding="utf-8").splitlines()[0])
+    assert obj["metrics"]["prompt_tokens"] == 0
+    assert obj["metrics"]["completion_tokens"] == 7